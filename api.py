@@ -0,0 +1,102 @@
+import json
+
+import pandas as pd
+from flask import Response, jsonify, request, stream_with_context
+
+from metrics import format_kpis, summarize_batch
+
+CARD_NAMES = ['days', 'reps', 'volume', 'distance', 'time']
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+FALSE_VALUES = ('', '0', 'false', 'no', 'off')
+
+
+def _parse_date(value, i, field):
+    if value is None or value == '':
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"query {i}: '{field}' must be a date string")
+    try:
+        date = pd.to_datetime(value)
+    except (ValueError, OverflowError):
+        raise ValueError(f"query {i}: invalid {field} {value!r}")
+    if pd.isna(date):
+        raise ValueError(f"query {i}: invalid {field} {value!r}")
+    if date.tzinfo is not None:
+        # Workout dates are naive local dates; there is no safe conversion
+        raise ValueError(f"query {i}: {field} {value!r} must not have a timezone")
+    return date
+
+
+def _parse_flag(value):
+    value = (value or '').lower().strip()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f"invalid boolean {value!r}")
+
+
+def _parse_queries(payload):
+    """
+    Accepts {"queries": [...]} or a bare list. Each query may have
+    start_date, end_date (any pandas-parseable date), sports (list) and id.
+    Raises ValueError on malformed input, so nothing fails once a reply has started.
+    """
+    queries = payload.get('queries') if isinstance(payload, dict) else payload
+    if not isinstance(queries, list):
+        raise ValueError("expected a list of queries")
+
+    parsed = []
+    for i, query in enumerate(queries):
+        if not isinstance(query, dict):
+            raise ValueError(f"query {i} is not an object")
+        sports = query.get('sports')
+        if sports is not None and not isinstance(sports, list):
+            raise ValueError(f"query {i}: 'sports' must be a list")
+        parsed.append({
+            'id': query.get('id', i),
+            'start_date': _parse_date(query.get('start_date'), i, 'start_date'),
+            'end_date': _parse_date(query.get('end_date'), i, 'end_date'),
+            # Activities are stored lower-cased by load_data
+            'sports': [str(s).lower().strip() for s in sports] if sports else None,
+        })
+    return parsed
+
+
+def _results(df, queries):
+    for query, kpis in zip(queries, summarize_batch(df, queries)):
+        yield {
+            'id': query['id'],
+            'kpis': kpis,
+            'cards': dict(zip(CARD_NAMES, format_kpis(kpis))),
+        }
+
+
+def register_api_routes(server, get_data):
+    """
+    Adds POST /api/summary to the Flask server.
+
+    get_data: callable returning the currently loaded DataFrame.
+    The body is a batch of queries (see _parse_queries); the reply is
+    {"results": [...]} in query order, or one JSON object per line
+    (application/x-ndjson) when called with ?stream=1 (or true/yes/on).
+    """
+
+    @server.route('/api/summary', methods=['POST'])
+    def summary():
+        try:
+            queries = _parse_queries(request.get_json(force=True, silent=True))
+            stream = _parse_flag(request.args.get('stream'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        df = get_data()
+
+        if stream:
+            def generate():
+                for result in _results(df, queries):
+                    yield json.dumps(result) + "\n"
+
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        return jsonify({'results': list(_results(df, queries))})
@@ -1,6 +1,8 @@
 import pandas as pd
 import re
 
+from profiling import profiled
+
 
 def parse_duration_to_minutes(duration_str):
     """
@@ -46,6 +48,7 @@ def parse_length_to_km(length_str):
 
 ##
 
+@profiled
 def load_data(filepath_or_url):
 
     try:
@@ -93,7 +96,6 @@ def load_data(filepath_or_url):
             if col in df.columns:
                 df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
 
-        df['month'] = df['date_obj'].dt.strftime('%Y-%m')
         df['week'] = df['date_obj'].dt.isocalendar().week
 
         return df.sort_values('date_obj')
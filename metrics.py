@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+
+def row_reps(df):
+    """
+    Reps per row: sets * reps, with missing sets counted as 1.
+    """
+    sets = df['sets'].where(df['sets'] > 0, 1)
+    reps = df['reps'].where(df['reps'] > 0, 0)
+    return sets * reps
+
+
+def row_tonnage(df):
+    """
+    Lifted kg per row: sets * reps * weight, with missing sets/reps counted as 1.
+    """
+    sets = df['sets'].where(df['sets'] > 0, 1)
+    reps = df['reps'].where(df['reps'] > 0, 1)
+    return (sets * reps * df['weight']).where(df['weight'] > 0, 0)
+
+
+def date_span_days(start, end):
+    start_dt = pd.to_datetime(start)
+    end_dt = pd.to_datetime(end)
+    return (end_dt - start_dt).days + 1 if pd.notna(start_dt) and pd.notna(end_dt) else 0
+
+
+# Additive KPIs are summed as integers in millionths of their unit, so totals are
+# exact and do not depend on summation order (per row here, per day in summarize_batch).
+FIXED_POINT = 10 ** 6
+SUMMED_KPIS = ('reps', 'tonnage_kg', 'km', 'minutes')
+
+
+def _fixed_point_rows(df):
+    values = {
+        'reps': row_reps(df),
+        'tonnage_kg': row_tonnage(df),
+        'km': df['length'],
+        'minutes': df['duration_mins'],
+    }
+    # NaN counts as 0, as pandas .sum() skipped it
+    return {name: np.rint(np.nan_to_num(series.to_numpy(dtype=float)) * FIXED_POINT).astype(np.int64)
+            for name, series in values.items()}
+
+
+def _kpis(active_days, total_days, totals):
+    return {
+        'active_days': int(active_days),
+        'total_days': total_days,
+        'reps': int(totals['reps'] // FIXED_POINT),
+        'tonnage_kg': int(totals['tonnage_kg']) / FIXED_POINT,
+        'km': round(int(totals['km']) / FIXED_POINT, 1),
+        'minutes': int(totals['minutes']) / FIXED_POINT,
+    }
+
+
+def summarize(dff, start, end):
+    """
+    Raw KPI values for rows already filtered to [start, end] and the selected sports.
+    """
+    totals = {name: values.sum() for name, values in _fixed_point_rows(dff).items()}
+    return _kpis(dff['date_obj'].dt.normalize().nunique(), date_span_days(start, end), totals)
+
+
+def format_kpis(kpis):
+    """
+    KPI card texts, in card order: days, reps, volume, distance, time.
+    """
+    days_str = f"{kpis['active_days']}/{kpis['total_days']}" if kpis['total_days'] > 0 else "0/0"
+    weight_str = f"{kpis['tonnage_kg'] / 1000:.1f} t"
+    kms_str = f"{kpis['km']} km"
+    hours = int(kpis['minutes'] // 60)
+    mins = int(kpis['minutes'] % 60)
+    duration_str = f"{hours}h {mins}m"
+    return days_str, kpis['reps'], weight_str, kms_str, duration_str
+
+
+def summarize_batch(df, queries):
+    """
+    Answers many (start_date, end_date, sports) queries with a single pass over df.
+
+    Rows are first rolled up into a (timestamp x activity) table; each query then
+    only slices that table. Missing dates default to the data range and an empty or
+    missing sport list means all sports, exactly like the dashboard filters.
+    Yields one KPI dict per query, in order.
+    """
+    # load_data returns a column-less frame when the source fails
+    if not df.empty and 'date_obj' in df.columns:
+        df = df[df['date_obj'].notna()]
+    if df.empty or 'date_obj' not in df.columns:
+        for query in queries:
+            yield _kpis(0, 0, dict.fromkeys(SUMMED_KPIS, 0))
+        return
+
+    # Roll up per exact timestamp (one row per day for date-only sheets) so the
+    # range bounds compare raw date_obj values, exactly like the dashboard mask.
+    metrics = pd.DataFrame({
+        'date_obj': df['date_obj'],
+        'activity': df['activity'],
+        'rows': 1,
+        **_fixed_point_rows(df),
+    })
+    rollup = metrics.groupby(['date_obj', 'activity']).sum().unstack('activity', fill_value=0)
+
+    times = rollup.index.values
+    day_codes = times.astype('datetime64[D]').astype(np.int64)
+    activities = rollup.columns.get_level_values('activity').unique()
+    activity_pos = {a: i for i, a in enumerate(activities)}
+    tables = {name: rollup[name].reindex(columns=activities).to_numpy() for name in
+              ('rows',) + SUMMED_KPIS}
+
+    min_date = df['date_obj'].min()
+    max_date = df['date_obj'].max()
+
+    for query in queries:
+        start = query.get('start_date') or min_date
+        end = query.get('end_date') or max_date
+        lo = np.searchsorted(times, pd.to_datetime(start).to_datetime64(), side='left')
+        hi = np.searchsorted(times, pd.to_datetime(end).to_datetime64(), side='right')
+
+        sports = query.get('sports')
+        if sports:
+            cols = [activity_pos[s] for s in sports if s in activity_pos]
+        else:
+            cols = list(range(len(activities)))
+
+        totals = {name: tables[name][lo:hi, cols].sum() for name in SUMMED_KPIS}
+        present = (tables['rows'][lo:hi, cols] > 0).any(axis=1)
+        # Timestamps are sorted, so distinct days are counted by day changes
+        active = day_codes[lo:hi][present]
+        active_days = len(active) and 1 + np.count_nonzero(np.diff(active))
+        yield _kpis(active_days, date_span_days(start, end), totals)
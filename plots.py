@@ -4,6 +4,8 @@ import numpy as np
 import pandas as pd
 from plotly.subplots import make_subplots
 
+from metrics import row_reps
+
 def plot_overview_timeline(df, color_map=None):
     if df.empty:
         return go.Figure()
@@ -87,30 +89,109 @@ def plot_activity_distribution(df, color_map=None):
 
 
 
-def plot_monthly_volume(df, color_map=None):
-    if df.empty:
-        return go.Figure()
-
-    df['duration_hours'] = df['duration_mins'] / 60
-
-    grouped = df.groupby(['month', 'activity'])['duration_hours'].sum().reset_index()
-
-    activity_order = grouped.groupby('activity')['duration_hours'] \
+# Candidate bar widths for the aggregate volume charts, finest first.
+TIME_BUCKETS = ['day', 'week', 'month', 'quarter', 'year']
+TIME_BUCKET_TITLES = {
+    'day': 'Daily',
+    'week': 'Weekly',
+    'month': 'Monthly',
+    'quarter': 'Quarterly',
+    'year': 'Yearly',
+}
+# Upper bound on the number of periods (bars per activity) shown on the x-axis.
+MAX_TIME_BUCKETS = 60
+
+
+def period_codes(dates, bucket):
+    """
+    Maps a datetime Series to integer period codes for the given bucket.
+    Codes are consecutive integers, so (max - min + 1) is the number of periods spanned.
+    """
+    days = dates.values.astype('datetime64[D]').astype(np.int64)
+    if bucket == 'day':
+        return days
+    if bucket == 'week':
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday
+        return (days + 3) // 7
+
+    months = dates.values.astype('datetime64[M]').astype(np.int64)
+    if bucket == 'month':
+        return months
+    if bucket == 'quarter':
+        return months // 3
+    return months // 12
+
+
+def period_label(code, bucket):
+    code = int(code)
+    if bucket == 'day':
+        return str(np.datetime64(code, 'D'))
+    if bucket == 'week':
+        return str(np.datetime64(code * 7 - 3, 'D'))  # Monday of the week
+    if bucket == 'month':
+        return str(np.datetime64(code, 'M'))
+    if bucket == 'quarter':
+        return f"{1970 + code // 4}-Q{code % 4 + 1}"
+    return str(1970 + code)
+
+
+def choose_time_bucket(dates, max_buckets=MAX_TIME_BUCKETS):
+    """
+    Picks the finest bucket whose span over the given dates fits in max_buckets.
+    """
+    dates = dates.dropna()
+    if dates.empty:
+        return 'month'
+
+    for bucket in TIME_BUCKETS:
+        codes = period_codes(dates, bucket)
+        if codes.max() - codes.min() + 1 <= max_buckets:
+            return bucket
+    return TIME_BUCKETS[-1]
+
+
+def _group_by_period(df, values):
+    """
+    Sums `values` per (period, activity) using an automatically chosen bucket.
+    Returns the grouped frame (with a 'period' label column), the ordered
+    period labels and the bucket name.
+    """
+    valid = df['date_obj'].notna()
+    dates = df.loc[valid, 'date_obj']
+    bucket = choose_time_bucket(dates)
+
+    grouped = pd.DataFrame({
+        'code': period_codes(dates, bucket),
+        'activity': df.loc[valid, 'activity'].to_numpy(),
+        'value': values[valid].to_numpy(),
+    }).groupby(['code', 'activity'], sort=True)['value'].sum().reset_index()
+
+    labels = {code: period_label(code, bucket) for code in grouped['code'].unique()}
+    grouped['period'] = grouped['code'].map(labels)
+    period_order = [labels[code] for code in sorted(labels)]
+    return grouped, period_order, bucket
+
+
+def _plot_period_volume(df, values, value_name, title, color_map=None):
+    grouped, period_order, bucket = _group_by_period(df, values)
+    grouped = grouped.rename(columns={'value': value_name})
+
+    activity_order = grouped.groupby('activity')[value_name] \
                             .sum().sort_values(ascending=False).index.tolist()
-    month_order = sorted(grouped['month'].unique())
 
     fig = px.bar(
         grouped,
-        x='month',
-        y='duration_hours',
+        x='period',
+        y=value_name,
         color='activity',
-        title="Monthly Volume (Hours)",
+        title=f"{TIME_BUCKET_TITLES[bucket]} {title}",
         color_discrete_map=color_map,
-        category_orders={'month': month_order, 'activity': activity_order}
+        category_orders={'period': period_order, 'activity': activity_order}
     )
     fig.update_layout(
         template="plotly_white",
         barmode='stack',
+        xaxis_title=None,
         legend=dict(
             orientation="h",
             yanchor="top",
@@ -123,60 +204,27 @@ def plot_monthly_volume(df, color_map=None):
     fig.update_xaxes(
         type='category',
         categoryorder='array',
-        categoryarray=month_order,
+        categoryarray=period_order,
         tickmode='array',
-        tickvals=month_order,
-        ticktext=month_order
+        tickvals=period_order,
+        ticktext=period_order
     )
     return fig
 
-def plot_monthly_reps_volume(df, color_map=None):
+
+def plot_monthly_volume(df, color_map=None):
     if df.empty:
         return go.Figure()
 
-    df = df.copy()
-
-    def calc_reps(row):
-        s = row['sets'] if row['sets'] > 0 else 1
-        r = row['reps'] if row['reps'] > 0 else 0
-        return s * r
+    duration_hours = df['duration_mins'] / 60
+    return _plot_period_volume(df, duration_hours, 'duration_hours', "Volume (Hours)", color_map)
 
-    df['total_reps'] = df.apply(calc_reps, axis=1)
-    grouped = df.groupby(['month', 'activity'])['total_reps'].sum().reset_index()
 
-    activity_order = grouped.groupby('activity')['total_reps'] \
-                            .sum().sort_values(ascending=False).index.tolist()
-    month_order = sorted(grouped['month'].unique())
+def plot_monthly_reps_volume(df, color_map=None):
+    if df.empty:
+        return go.Figure()
 
-    fig = px.bar(
-        grouped,
-        x='month',
-        y='total_reps',
-        color='activity',
-        title="Monthly Volume (Reps)",
-        color_discrete_map=color_map,
-        category_orders={'month': month_order, 'activity': activity_order}
-    )
-    fig.update_layout(
-        template="plotly_white",
-        barmode='stack',
-        legend=dict(
-            orientation="h",
-            yanchor="top",
-            y=-0.2,
-            xanchor="center",
-            x=0.5,
-            title=None
-        )
-    )
-    fig.update_xaxes(
-        type='category',
-        categoryorder='array',
-        categoryarray=month_order,
-        tickmode='array',
-        tickvals=month_order,
-        ticktext=month_order
-    )
+    fig = _plot_period_volume(df, row_reps(df), 'total_reps', "Volume (Reps)", color_map)
     fig.update_yaxes(title="Total Reps")
     return fig
 
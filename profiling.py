@@ -0,0 +1,194 @@
+import cProfile
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+from flask import jsonify, request
+
+# --- CONFIG ---
+# Set BROANALYTICS_PROFILE=1 to profile every wrapped call.
+PROFILE_ENABLED = os.environ.get('BROANALYTICS_PROFILE', '').lower() in ('1', 'true', 'yes', 'on')
+PROFILE_DIR = os.environ.get('BROANALYTICS_PROFILE_DIR', 'profiles')
+# Oldest invocations are deleted once the directory holds more than this many.
+MAX_PROFILES = int(os.environ.get('BROANALYTICS_PROFILE_MAX', '200'))
+TOP_ALLOCATIONS = 10
+
+_local = threading.local()
+_rotate_lock = threading.Lock()
+
+# tracemalloc is process-wide, so it is started by the first active profiled
+# call (across all threads) and stopped by the last one.
+_trace_lock = threading.Lock()
+_active_calls = 0
+_started_tracing = False
+_overlap_epoch = 0
+
+
+def _tag(func, args, kwargs):
+    # Filter inputs by parameter name, as plain JSON so reports can be searched and compared.
+    try:
+        inputs = inspect.signature(func).bind(*args, **kwargs).arguments
+    except (TypeError, ValueError):
+        inputs = {'args': list(args), 'kwargs': kwargs}
+    return json.loads(json.dumps(dict(inputs), default=str))
+
+
+def _rotate():
+    with _rotate_lock:
+        reports = sorted(f for f in os.listdir(PROFILE_DIR) if f.endswith('.json'))
+        for name in reports[:max(0, len(reports) - MAX_PROFILES)]:
+            stem = name[:-len('.json')]
+            for ext in ('.json', '.prof'):
+                try:
+                    os.remove(os.path.join(PROFILE_DIR, stem + ext))
+                except FileNotFoundError:
+                    pass
+
+
+def _begin_tracing():
+    """
+    Registers an active profiled call. Returns (overlapping, epoch) for _end_tracing.
+    """
+    global _active_calls, _started_tracing, _overlap_epoch
+    with _trace_lock:
+        overlapping = _active_calls > 0
+        if overlapping:
+            _overlap_epoch += 1
+        else:
+            _started_tracing = not tracemalloc.is_tracing()
+            if _started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        _active_calls += 1
+        return overlapping, _overlap_epoch
+
+
+def _end_tracing(overlapping, epoch):
+    """
+    Unregisters an active profiled call. Returns True if any other call overlapped it.
+    """
+    global _active_calls, _started_tracing
+    with _trace_lock:
+        overlapped = overlapping or _overlap_epoch != epoch
+        _active_calls -= 1
+        if _active_calls == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+        return overlapped
+
+
+def profiled(func):
+    """
+    Wraps a function with cProfile and tracemalloc when profiling is enabled.
+    Each call writes <stem>.prof (pstats) and <stem>.json (timing, peak memory,
+    top allocation sites and the call inputs) to PROFILE_DIR.
+    Returns the function untouched when profiling is disabled.
+    Profiling errors are reported but never propagate to the caller.
+    """
+    if not PROFILE_ENABLED:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Nested calls (e.g. load_data during a refresh) are covered by the outer profile.
+        if getattr(_local, 'active', False):
+            return func(*args, **kwargs)
+
+        _local.active = True
+        overlapping, epoch = _begin_tracing()
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active (cProfile is process-wide on Python 3.12+)
+            profiler = None
+
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+
+            peak, top = None, []
+            try:
+                _, peak = tracemalloc.get_traced_memory()
+                top = tracemalloc.take_snapshot().statistics('lineno')[:TOP_ALLOCATIONS]
+            except Exception as e:
+                print(f"Warning: could not read memory stats for {func.__name__} ({e})")
+            finally:
+                overlapped = _end_tracing(overlapping, epoch)
+                _local.active = False
+
+            try:
+                os.makedirs(PROFILE_DIR, exist_ok=True)
+                stem = f"{time.time_ns()}_{func.__name__}"
+                if profiler is not None:
+                    profiler.dump_stats(os.path.join(PROFILE_DIR, stem + '.prof'))
+                report = {
+                    'id': stem,
+                    'function': func.__name__,
+                    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'elapsed_s': round(elapsed, 4),
+                    'peak_bytes': peak,
+                    # tracemalloc is process-wide: with overlapping calls, peak and
+                    # allocations include whatever the other calls allocated.
+                    'overlapped': overlapped,
+                    'cpu_profile': profiler is not None,
+                    'top_allocations': [
+                        {'where': str(stat.traceback), 'size_bytes': stat.size, 'count': stat.count}
+                        for stat in top
+                    ],
+                    'inputs': _tag(func, args, kwargs),
+                }
+                with open(os.path.join(PROFILE_DIR, stem + '.json'), 'w') as f:
+                    json.dump(report, f, indent=2)
+                _rotate()
+            except Exception as e:
+                print(f"Warning: could not save profile for {func.__name__} ({e})")
+
+    return wrapper
+
+
+def load_reports():
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+
+    reports = []
+    for name in os.listdir(PROFILE_DIR):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(PROFILE_DIR, name)) as f:
+                reports.append(json.load(f))
+        except (OSError, ValueError):
+            # Rotated away or half-written by a concurrent call
+            continue
+    return reports
+
+
+def register_profile_routes(server):
+    """
+    Adds GET /profiles to the Flask server, listing the slowest saved invocations.
+    Query params: limit (default 20), function (optional name filter).
+    """
+
+    @server.route('/profiles')
+    def list_profiles():
+        limit = request.args.get('limit', default=20, type=int)
+        function = request.args.get('function')
+
+        reports = load_reports()
+        if function:
+            reports = [r for r in reports if r.get('function') == function]
+        reports.sort(key=lambda r: r.get('elapsed_s', 0), reverse=True)
+
+        return jsonify([
+            {k: r.get(k) for k in ('id', 'function', 'timestamp', 'elapsed_s', 'peak_bytes', 'overlapped', 'inputs')}
+            for r in reports[:limit]
+        ])
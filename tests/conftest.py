@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# The app modules live at the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_loader  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def main_module():
+    # main loads DATA_SOURCE at import time; keep the tests offline.
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(data_loader, 'load_data', lambda filepath_or_url: pd.DataFrame())
+        import main
+    return main
+
+
+@pytest.fixture
+def workouts():
+    return pd.DataFrame({
+        'date_obj': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-01-03', '2024-02-10', '2024-03-05']),
+        'activity': ['bench press', 'running', 'bench press', 'squat', 'running'],
+        'duration': ['45m', '30m', '1h', '', '40m'],
+        'duration_mins': [45.0, 30.0, 60.0, 0.0, 40.0],
+        'length': [0.0, 5.2, 0.0, 0.0, 7.5],
+        'sets': [3.0, 0.0, 4.0, 5.0, 0.0],
+        'reps': [8.0, 0.0, 6.0, 5.0, 0.0],
+        'weight': [60.0, 0.0, 70.0, 100.0, 0.0],
+        'elevation': [0.0, 20.0, 0.0, 0.0, 35.0],
+        'comment': ['', '', 'pr', '', ''],
+        'where': ['gym', 'park', 'gym', 'home', 'park'],
+    })
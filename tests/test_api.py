@@ -0,0 +1,63 @@
+import json
+
+import pandas as pd
+import pytest
+from flask import Flask
+
+from api import register_api_routes
+
+
+@pytest.fixture
+def client(workouts):
+    server = Flask(__name__)
+    register_api_routes(server, lambda: workouts)
+    return server.test_client()
+
+
+def test_summary(client):
+    reply = client.post('/api/summary', json={'queries': [
+        {'id': 'bench', 'sports': ['Bench Press']},
+        {'start_date': '2024-01-01', 'end_date': '2024-01-31'},
+    ]})
+    assert reply.status_code == 200
+    bench, january = reply.json['results']
+    assert bench['id'] == 'bench'
+    assert bench['kpis']['reps'] == 48
+    assert bench['cards']['volume'] == "3.1 t"
+    assert january['cards']['days'] == "2/31"
+
+
+@pytest.mark.parametrize('flag', ['1', 'true', 'Yes', 'on'])
+def test_summary_stream(client, flag):
+    reply = client.post(f'/api/summary?stream={flag}', json=[{}, {'sports': ['running']}])
+    assert reply.status_code == 200
+    assert reply.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in reply.get_data(as_text=True).splitlines()]
+    assert [line['id'] for line in lines] == [0, 1]
+    assert lines[1]['cards']['distance'] == "12.7 km"
+
+
+@pytest.mark.parametrize('url', ['/api/summary', '/api/summary?stream=1'])
+@pytest.mark.parametrize('bad', ['notadate', '2024-01-01T00:00:00Z', '2024-01-01 08:00+02:00'])
+def test_summary_bad_date(client, url, bad):
+    reply = client.post(url, json=[{'start_date': '2020-01-01'}, {'end_date': bad}])
+    assert reply.status_code == 400
+    assert 'query 1' in reply.json['error']
+
+
+@pytest.mark.parametrize('body', ['junk', json.dumps({'queries': {}}), json.dumps([{'sports': 'squat'}])])
+def test_summary_bad_body(client, body):
+    reply = client.post('/api/summary', data=body, content_type='application/json')
+    assert reply.status_code == 400
+
+
+def test_summary_no_data():
+    server = Flask(__name__)
+    register_api_routes(server, lambda: pd.DataFrame())
+    reply = server.test_client().post('/api/summary', json=[{}, {'sports': ['running']}])
+    assert reply.status_code == 200
+    assert [r['cards']['days'] for r in reply.json['results']] == ["0/0", "0/0"]
+
+
+def test_summary_bad_stream_flag(client):
+    assert client.post('/api/summary?stream=maybe', json=[{}]).status_code == 400
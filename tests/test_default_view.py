@@ -0,0 +1,36 @@
+import json
+
+import pandas as pd
+from plotly.io.json import to_json_plotly
+
+
+def _encoded(value):
+    # What Dash sends to the browser for a layout prop or callback output
+    return json.loads(to_json_plotly(value))
+
+
+def _assert_matches_callback(main, df):
+    color_map = main.get_color_map(df)
+    view = main.build_default_view(df, color_map)
+    outputs = main.compute_dashboard(df, color_map, None, None, None, None)
+
+    assert list(view) == main.DASHBOARD_OUTPUTS
+    for key, value in zip(main.DASHBOARD_OUTPUTS, outputs):
+        assert _encoded(view[key]) == _encoded(value), key
+
+
+def test_default_view_matches_callback(main_module, workouts):
+    _assert_matches_callback(main_module, workouts)
+
+
+def test_default_view_matches_callback_empty(main_module):
+    _assert_matches_callback(main_module, pd.DataFrame())
+
+
+def test_layout_serves_default_view(main_module, workouts, monkeypatch):
+    color_map = main_module.get_color_map(workouts)
+    monkeypatch.setattr(main_module, 'default_view', main_module.build_default_view(workouts, color_map))
+
+    layout = _encoded(main_module.serve_layout())
+    assert '"kpi-days"' in json.dumps(layout)
+    assert main_module.default_view[('kpi-days', 'children')] in json.dumps(layout)
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+from metrics import format_kpis, summarize, summarize_batch
+
+SPORTS = ['running', 'bench press', 'squat', 'biking']
+
+
+def _random_workouts(rng, n=600):
+    dates = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 400, n), unit='D')
+    # Half the rows at midnight (date-only sheets), half with a time of day
+    dates = dates + pd.to_timedelta(rng.choice([0, 0, 8, 18], n), unit='h')
+    df = pd.DataFrame({
+        'date_obj': dates,
+        'activity': rng.choice(SPORTS, n),
+        'duration': '',
+        'duration_mins': rng.choice([0.0, 20.0, 45.5], n),
+        'length': rng.choice([0.0, 5.3, 1.25], n),
+        'sets': rng.choice([0.0, 3.0, 4.0], n),
+        'reps': rng.choice([0.0, 5.0, 8.0], n),
+        'weight': rng.choice([0.0, 40.0, 62.5], n),
+        'elevation': 0.0,
+        'comment': '',
+        'where': 'gym',
+    })
+    # Unparseable dates end up as NaT after load_data
+    df.loc[rng.choice(n, 10, replace=False), 'date_obj'] = pd.NaT
+    return df.sort_values('date_obj').reset_index(drop=True)
+
+
+def _random_queries(rng, count=30):
+    base = pd.Timestamp('2022-12-15')
+    queries = [
+        {'start_date': None, 'end_date': None, 'sports': None},
+        {'start_date': None, 'end_date': None, 'sports': []},
+        {'start_date': '2023-03-01', 'end_date': None, 'sports': ['no such sport']},
+        {'start_date': None, 'end_date': '2023-06-30', 'sports': ['no such sport', 'squat']},
+        {'start_date': '2023-09-01', 'end_date': '2023-05-01', 'sports': None},
+        {'start_date': '2023-04-02', 'end_date': '2023-04-02', 'sports': ['running']},
+        {'start_date': '2023-04-02 08:00', 'end_date': '2023-05-10 12:00', 'sports': None},
+    ]
+    while len(queries) < count:
+        a, b = rng.integers(0, 450, 2)
+        sports = list(rng.choice(SPORTS + ['no such sport'], rng.integers(0, 4), replace=False))
+        queries.append({
+            'start_date': (base + pd.Timedelta(days=int(a))).strftime('%Y-%m-%d'),
+            'end_date': (base + pd.Timedelta(days=int(b))).strftime('%Y-%m-%d'),
+            'sports': sports,
+        })
+    return queries
+
+
+def test_summarize_batch_matches_cards(main_module):
+    rng = np.random.default_rng(7)
+    df = _random_workouts(rng)
+    color_map = main_module.get_color_map(df)
+    queries = _random_queries(rng)
+
+    results = list(summarize_batch(df, queries))
+    assert len(results) == len(queries)
+    for query, kpis in zip(queries, results):
+        cards = main_module.compute_dashboard(
+            df, color_map, query['sports'], query['start_date'], query['end_date'], None)[:5]
+        assert format_kpis(kpis) == cards, query
+
+
+def test_summarize_batch_times_of_day(main_module):
+    df = pd.DataFrame({
+        'date_obj': pd.to_datetime(['2024-01-01 08:00', '2024-01-05 18:00', '2024-01-10 09:00']),
+        'activity': 'running',
+        'duration': '',
+        'duration_mins': 30.0,
+        'length': 1.0,
+        'sets': 0.0,
+        'reps': 0.0,
+        'weight': 0.0,
+        'elevation': 0.0,
+        'comment': '',
+        'where': '',
+    })
+    queries = [
+        {'start_date': None, 'end_date': None, 'sports': None},
+        {'start_date': None, 'end_date': '2024-01-05', 'sports': None},
+    ]
+    results = [format_kpis(kpis) for kpis in summarize_batch(df, queries)]
+    # The default start is the first timestamp (08:00), which must stay included
+    assert [(r[0], r[3]) for r in results] == [("3/10", "3.0 km"), ("1/4", "1.0 km")]
+    for query, result in zip(queries, results):
+        cards = main_module.compute_dashboard(df, {}, None, query['start_date'], query['end_date'], None)
+        assert result == cards[:5]
+
+
+def test_summarize_batch_empty():
+    queries = [{'start_date': None, 'end_date': None, 'sports': None}]
+    # What load_data returns when the source cannot be read
+    assert format_kpis(next(summarize_batch(pd.DataFrame(), queries))) == \
+        ("0/0", 0, "0.0 t", "0.0 km", "0h 0m")
+
+
+def test_nan_metrics_are_skipped(workouts):
+    workouts.loc[1, 'length'] = np.nan
+    workouts.loc[0, 'duration_mins'] = np.nan
+    queries = [{'start_date': None, 'end_date': None, 'sports': None}]
+    expected = ("4/65", 73, "5.6 t", "7.5 km", "2h 10m")
+    assert format_kpis(summarize(workouts, '2024-01-01', '2024-03-05')) == expected
+    assert format_kpis(next(summarize_batch(workouts, queries))) == expected
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from plots import MAX_TIME_BUCKETS, choose_time_bucket, period_codes, period_label
+
+
+def _span(start, periods, freq='D'):
+    return pd.Series(pd.date_range(start, periods=periods, freq=freq))
+
+
+@pytest.mark.parametrize('days, bucket', [
+    (1, 'day'),
+    (MAX_TIME_BUCKETS, 'day'),
+    (MAX_TIME_BUCKETS + 1, 'week'),
+    (365, 'week'),
+    (3 * 365, 'month'),
+    (6 * 365, 'quarter'),
+    (20 * 365, 'year'),
+])
+def test_choose_time_bucket(days, bucket):
+    assert choose_time_bucket(_span('2020-01-01', days)) == bucket
+
+
+def test_choose_time_bucket_ignores_nat():
+    dates = pd.Series(pd.to_datetime(['2024-01-01', None, '2024-01-03']))
+    assert choose_time_bucket(dates) == 'day'
+    assert choose_time_bucket(pd.Series(pd.to_datetime([None]))) == 'month'
+
+
+def _labels(dates, bucket):
+    dates = pd.Series(pd.to_datetime(dates))
+    return [period_label(code, bucket) for code in period_codes(dates, bucket)]
+
+
+def test_week_labels_start_on_monday():
+    # Sunday, Monday, Sunday, Monday; 1970-01-01 itself was a Thursday
+    assert _labels(['2024-05-05', '2024-05-06', '2024-05-12', '2024-05-13', '1970-01-01'], 'week') == \
+        ['2024-04-29', '2024-05-06', '2024-05-06', '2024-05-13', '1969-12-29']
+
+
+def test_quarter_and_year_labels():
+    dates = ['2024-03-31', '2024-04-01', '2024-12-31', '1969-12-31', '1969-01-01']
+    assert _labels(dates, 'quarter') == ['2024-Q1', '2024-Q2', '2024-Q4', '1969-Q4', '1969-Q1']
+    assert _labels(dates, 'year') == ['2024', '2024', '2024', '1969', '1969']
+    assert _labels(dates, 'month') == ['2024-03', '2024-04', '2024-12', '1969-12', '1969-01']
+
+
+def test_period_codes_are_consecutive():
+    dates = _span('1969-11-01', 5, freq='MS')
+    assert list(period_codes(dates, 'month')) == [-2, -1, 0, 1, 2]
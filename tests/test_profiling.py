@@ -0,0 +1,60 @@
+import json
+import os
+import threading
+
+import profiling
+
+
+def _reports(path):
+    reports = []
+    for name in os.listdir(path):
+        if name.endswith('.json'):
+            with open(os.path.join(path, name)) as f:
+                reports.append(json.load(f))
+    return reports
+
+
+def test_overlapping_calls_on_threads(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, 'PROFILE_ENABLED', True)
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+
+    first_started = threading.Event()
+    first_may_finish = threading.Event()
+
+    @profiling.profiled
+    def slow(selected_sports, start_date=None):
+        first_started.set()
+        first_may_finish.wait(5)
+        return [0] * 1000
+
+    @profiling.profiled
+    def fast(selected_sports, start_date=None):
+        return [1] * 1000
+
+    results = {}
+    thread = threading.Thread(target=lambda: results.setdefault('slow', slow(['run'])))
+    thread.start()
+    first_started.wait(5)
+    # Finishes while `slow` is still running on the other thread
+    results['fast'] = fast(['bike'], start_date='2024-01-01')
+    first_may_finish.set()
+    thread.join(5)
+
+    assert results['slow'] == [0] * 1000
+    assert results['fast'] == [1] * 1000
+    assert not profiling.tracemalloc.is_tracing()
+
+    reports = {r['function']: r for r in _reports(tmp_path)}
+    assert reports['slow']['overlapped'] and reports['fast']['overlapped']
+    assert reports['slow']['peak_bytes'] is not None
+    assert reports['fast']['inputs'] == {'selected_sports': ['bike'], 'start_date': '2024-01-01'}
+    assert reports['slow']['inputs'] == {'selected_sports': ['run']}
+
+
+def test_disabled_returns_function(monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILE_ENABLED', False)
+
+    def f():
+        return 1
+
+    assert profiling.profiled(f) is f